@@ -1,14 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import time
-import random
 import os
 import base64
+import asyncio
 
 # Import modules created in previous steps
-from utils import load_global_analytics, predict_complaint_class, load_geo_analytics
-from llm_agent import generate_ai_response
+from utils import load_global_analytics, load_geo_analytics, get_global_kpis
+from llm_agent import analyze_complaint, generate_ai_response
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -26,6 +25,21 @@ elif os.path.exists("GroqAPI_Key.txt"):
     with open("GroqAPI_Key.txt", "r") as f:
         os.environ["GROQ_API_KEY"] = f.read().strip()
 
+# --- CLASSIFIER LABEL MAPPING ---
+LABELS = {
+    "LABEL_0": 'Information belongs to someone else',
+    "LABEL_1": 'Reporting company used your report improperly',
+    "LABEL_2": 'Their investigation did not fix an error on your report',
+    "LABEL_3": 'Account information incorrect',
+    "LABEL_4": 'Account status incorrect',
+    "LABEL_5": "Credit inquiries on your report that you don't recognize",
+    "LABEL_6": 'Investigation took more than 30 days',
+    "LABEL_7": 'Debt is not yours',
+    "LABEL_8": 'Was not notified of investigation status or results',
+    "LABEL_9": 'Personal information incorrect',
+    "LABEL_10": "Other"
+}
+
 # --- CUSTOM CSS FOR UI ---
 st.markdown("""
     <style>
@@ -85,15 +99,11 @@ with col1:
     st.markdown("##### Powered by Big Data Analytics & Deep Learning")
 
 with col2:
-    # Compute KPIs
+    # Compute KPIs (cached scalar, not a per-rerun column reduction)
     total_complaints = 4582954
-    avg_timely_rate = df_global["timely_response_rate"].mean()
-    avg_dispute_rate = df_global["dispute_rate"].mean()
+    avg_timely_rate = get_global_kpis()
 
     timely_pct = f"{avg_timely_rate * 100:.2f}%"
-    dispute_pct = f"{avg_dispute_rate * 100:.2f}%"
-
-    total_timely_resolved = int(total_complaints * avg_timely_rate)
 
     kpi1, kpi2 = st.columns(2)
     kpi1.metric(
@@ -111,83 +121,100 @@ with col2:
 st.divider()
 
 # --- SECTION: GENERAL ANALYTICS ---
-st.markdown("## Global Complaint Landscape")
-st.markdown("##### Real-time analysis of Banking Complaints in the US")
-viz_col1, viz_col2 = st.columns([2, 1])
-
-# --------------------------
-# LEFT: Bar Chart
-# --------------------------
-with viz_col1:
-    top11 = df_global.sort_values("total_complaints", ascending=False).head(11)
-
-    fig_bar = px.bar(
-        top11,
-        x='sub-issues',
-        y='total_complaints',
-        color='total_complaints',
-        title="Top Complaint Sub-Issues",
-        color_continuous_scale='Blues'
-    )
-    fig_bar.update_layout(
-        height=500,
-        margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Sub-Issue",
-        yaxis_title="Total Complaints"
-    )
-    st.plotly_chart(fig_bar, width='stretch')
-
-# --------------------------
-# RIGHT: Donut Chart
-# --------------------------
-with viz_col2:
-    # Based on timely response rate and dispute rate
-    timely = df_global['timely_response_rate'].mean()
-    not_timely = 1 - timely
-
-    fig_pie = px.pie(
-        values=[timely, not_timely],
-        names=['Timely Response', 'Not Timely'],
-        title="Timely Response Rate (Overall)",
-        hole=0.4,
+# Wrapped in fragments so interactions elsewhere in the app (e.g. the AI
+# assistant) don't rebuild and re-serialize the Plotly figures.
+
+@st.fragment
+def render_global_charts(df_global):
+    viz_col1, viz_col2 = st.columns([2, 1])
+
+    # --------------------------
+    # LEFT: Bar Chart
+    # --------------------------
+    with viz_col1:
+        # Partial heap sort: O(n log k) vs a full sort's O(n log n)
+        top11 = df_global.nlargest(11, "total_complaints")
+
+        fig_bar = px.bar(
+            top11,
+            x='sub-issues',
+            y='total_complaints',
+            color='total_complaints',
+            title="Top Complaint Sub-Issues",
+            color_continuous_scale='Blues'
+        )
+        fig_bar.update_layout(
+            height=500,
+            margin=dict(l=20, r=20, t=40, b=20),
+            xaxis_title="Sub-Issue",
+            yaxis_title="Total Complaints"
+        )
+        st.plotly_chart(fig_bar, width='stretch')
+
+    # --------------------------
+    # RIGHT: Donut Chart
+    # --------------------------
+    with viz_col2:
+        # Based on the overall timely response rate
+        timely = get_global_kpis()
+        not_timely = 1 - timely
+
+        fig_pie = px.pie(
+            values=[timely, not_timely],
+            names=['Timely Response', 'Not Timely'],
+            title="Timely Response Rate (Overall)",
+            hole=0.4,
+        )
+
+        fig_pie.update_layout(
+            height=500,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        st.plotly_chart(fig_pie, width='stretch')
+
+@st.cache_resource
+def build_choropleth():
+    # The geo data is static, so the figure (including resolved state
+    # geometries) is built once and reused across reruns
+    # 1. Load Data
+    df_geo = load_geo_analytics()
+
+    # 2. Create Map
+    fig_map = px.choropleth(
+        df_geo,
+        locations='State',
+        locationmode="USA-states",
+        color='Total Complaints',
+        scope="usa",
+        hover_name='Hover_State',
+        hover_data=['Most Common Issue', 'Company Most Commonly Complained About', 'No of Complaints Closed Timely'],
+        color_continuous_scale='Blues',
+        labels={'Complaints': 'Total Complaints'}
     )
-    
-    fig_pie.update_layout(
-        height=500,
-        margin=dict(l=20, r=20, t=40, b=20)
+
+    # 3. Layout Adjustments
+    fig_map.update_layout(
+        geo=dict(bgcolor='rgba(0,0,0.5,0.05)'),
+        margin={"r":0,"t":0,"l":0,"b":0},  # Tight margins
+        height=400
     )
-    st.plotly_chart(fig_pie, width='stretch')
+
+    return fig_map
+
+@st.fragment
+def render_geo_map():
+    st.plotly_chart(build_choropleth(), width='stretch')
+
+st.markdown("## Global Complaint Landscape")
+st.markdown("##### Real-time analysis of Banking Complaints in the US")
+render_global_charts(df_global)
 
 st.divider()
 
 # --- SECTION: GEOGRAPHIC MAP ---
 st.markdown("## Geographic Complaint Intensity")
 st.markdown("##### Interactive map showing complaint volume by state. Hover for details.")
-
-# 1. Load Data
-df_geo = load_geo_analytics()
-
-# 2. Create Map
-fig_map = px.choropleth(
-    df_geo,
-    locations='State',
-    locationmode="USA-states",
-    color='Total Complaints',
-    scope="usa",
-    hover_name='Hover_State',
-    hover_data=['Most Common Issue', 'Company Most Commonly Complained About', 'No of Complaints Closed Timely'],
-    color_continuous_scale='Blues',
-    labels={'Complaints': 'Total Complaints'}
-)
-
-# 3. Layout Adjustments
-fig_map.update_layout(
-    geo=dict(bgcolor='rgba(0,0,0.5,0.05)'),
-    margin={"r":0,"t":0,"l":0,"b":0},  # Tight margins
-    height=400
-)
-
-st.plotly_chart(fig_map, width='stretch')
+render_geo_map()
 
 st.divider()
 
@@ -205,37 +232,17 @@ if st.button("Analyze & Resolve", type="primary"):
     else:
         # 1. Processing UI
         with st.status("Processing Complaint...", expanded=True) as status:
-            st.write("🔍 Tokenizing text...")
-            time.sleep(0.5)
-            st.write("🧠 Running Classification Model...")
-            
-            # 2. Call Classification Model
-            label = predict_complaint_class(user_complaint)
-
-            labels = {
-                "LABEL_0": 'Information belongs to someone else',
-                "LABEL_1": 'Reporting company used your report improperly',
-                "LABEL_2": 'Their investigation did not fix an error on your report',
-                "LABEL_3": 'Account information incorrect',
-                "LABEL_4": 'Account status incorrect',
-                "LABEL_5": "Credit inquiries on your report that you don't recognize",
-                "LABEL_6": 'Investigation took more than 30 days',
-                "LABEL_7": 'Debt is not yours',
-                "LABEL_8": 'Was not notified of investigation status or results',
-                "LABEL_9": 'Personal information incorrect',
-                "LABEL_10": "Other"
-            }
-
-            predicted_category = labels.get(label, "Unknown Category")
+            st.write("🧠 Running Classification Model & Retrieving Policy Documents...")
+
+            # 2. Run classification and retrieval concurrently
+            label, retrieved_docs = asyncio.run(analyze_complaint(user_complaint))
+
+            predicted_category = LABELS.get(label, "Unknown Category")
             st.write(f"✅ Classified as: **{predicted_category}** ({label})")
             
             # 3. Call GenAI
-            st.write("Retrieving Policy Documents & Generating Solution...")
-            
-            # Passing both complaint and category to the agent
-            ai_response = generate_ai_response(user_complaint, predicted_category)
-            time.sleep(0.5)
-            
+            st.write("Generating Solution...")
+
             status.update(label="Analysis Complete", state="complete", expanded=False)
 
         # 4. Display Results
@@ -245,14 +252,19 @@ if st.button("Analyze & Resolve", type="primary"):
             st.subheader("📂 Classification")
             st.success(f"**Issue Identified**: {predicted_category}")
 
-            # Show the GenAI Solution
-            st.markdown(f"""
+            # Show the GenAI Solution, streamed token-by-token into the card
+            card_html = """
             <div class="resolution-card">
             <i><b><h4>AI-Generated Resolution:</h4></b></i>
             <br>
-            {ai_response}
+            {}
             </div>
-            """, unsafe_allow_html=True)
+            """
+            placeholder = st.empty()
+            ai_response = ""
+            for chunk in generate_ai_response(user_complaint, predicted_category, retrieved_docs):
+                ai_response += chunk
+                placeholder.markdown(card_html.format(ai_response), unsafe_allow_html=True)
 
         # --- SECTION: SPECIALIZED ANALYTICS (Contextual) ---
         with res_col2:
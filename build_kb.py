@@ -0,0 +1,35 @@
+"""
+One-off build script for the persistent Chroma knowledge base.
+
+Embeds SAMPLE_KB_DATA once and writes the vector store to PERSIST_DIR so
+the app can simply load it at boot instead of re-embedding the documents
+on every cold start. Run at package/deploy time (or in the Docker build):
+
+    python build_kb.py
+"""
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.documents import Document
+
+from llm_agent import PERSIST_DIR, SAMPLE_KB_DATA, EMBEDDING_MODEL, EMBEDDING_MODEL_KWARGS
+
+
+def build_kb(embeddings=None):
+    """
+    Builds and persists the vector store from SAMPLE_KB_DATA.
+    Args:
+        embeddings: An optional pre-loaded embedding model; loaded here if omitted.
+    Returns:
+        The persisted Chroma vector store.
+    """
+    if embeddings is None:
+        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, model_kwargs=EMBEDDING_MODEL_KWARGS)
+
+    docs = [Document(page_content=item["content"], metadata={"issue": item["issue"]}) for item in SAMPLE_KB_DATA]
+
+    return Chroma.from_documents(documents=docs, embedding=embeddings, persist_directory=PERSIST_DIR)
+
+
+if __name__ == "__main__":
+    build_kb()
+    print(f"✅ Knowledge base built at {PERSIST_DIR}")
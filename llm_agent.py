@@ -1,194 +1,356 @@
-import os
-import shutil
-import streamlit as st
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq
-from langchain_classic.chains import create_retrieval_chain
-from langchain_classic.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.documents import Document
-
-# --- CONFIGURATION ---
-PERSIST_DIR = "./banking_chroma_db"
-
-def reset_knowledge_base():
-    """
-    Clears the Streamlit cache and deletes the persistent vector DB folder.
-    This forces a reload/rebuild of the knowledge base on the next run.
-    """
-    # 1. Clear the function cache so get_banking_retriever runs again
-    st.cache_resource.clear()
-    
-    # 2. Delete the physical folder if it exists
-    if os.path.exists(PERSIST_DIR):
-        try:
-            shutil.rmtree(PERSIST_DIR)
-            st.toast("✅ Persistent Database deleted. Reverting to Sample Data.", icon="🗑️")
-        except Exception as e:
-            st.error(f"Error deleting DB: {e}")
-    else:
-        st.toast("ℹ️ No persistent Database found. Cache cleared.", icon="🔄")
-
-# --- IN-SCRIPT KNOWLEDGE BASE (FALLBACK) ---
-SAMPLE_KB_DATA = [
-    {
-        "issue": "Information belongs to someone else (LABEL_0)",
-        "content": "Complaint: There is a mortgage account on my credit report that belongs to my twin brother. We have similar names but different SSNs. \nResolution: This appears to be a 'mixed file' error. Under the FCRA, credit bureaus must ensure maximum possible accuracy. Action: Verify the consumer's personal identifiers (SSN, DOB). Separate the credit files immediately and send a confirmation of the correction."
-    },
-    {
-        "issue": "Reporting company used your report improperly (LABEL_1)",
-        "content": "Complaint: A car dealership pulled my credit report yesterday, but I never visited them or applied for a loan. \nResolution: Accessing a consumer report without 'permissible purpose' violates the FCRA. Action: Investigation required. If the dealership cannot prove the consumer applied for credit, the hard inquiry must be removed/suppressed from the report."
-    },
-    {
-        "issue": "Their investigation did not fix an error on your report (LABEL_2)",
-        "content": "Complaint: I disputed a late payment charge last month. You said it was verified, but I have a bank statement proving I paid on time. \nResolution: If a consumer provides new relevant information, the furnisher must conduct a reasonable reinvestigation. Action: Review the proof of payment provided. If valid, update the trade line to 'Current/Paid as Agreed' and notify all bureaus."
-    },
-    {
-        "issue": "Account information incorrect (LABEL_3)",
-        "content": "Complaint: My credit card balance is showing as $5,000 on my report, but I paid it down to zero two weeks ago. \nResolution: Data furnishing issues often occur due to reporting cycles. However, furnishers must report accurate information. Action: Check the 'Date Reported'. If the payment was made after that date, explain the cycle. If the report is outdated, trigger an off-cycle update (AUD) to correct the balance."
-    },
-    {
-        "issue": "Account status incorrect (LABEL_4)",
-        "content": "Complaint: My closed auto loan is marked as 'Voluntary Surrender' but I paid it off in full. \nResolution: Incorrect status codes can severely damage credit scores. Action: Audit the account history. If paid in full, update the account status code to '13' (Paid or closed/zero balance) or the appropriate Metro 2 code representing a positive closure."
-    },
-    {
-        "issue": "Credit inquiries on your report that you don't recognize (LABEL_5)",
-        "content": "Complaint: I see three hard inquiries from 'ABC Lending' on Jan 15th. I did not apply for credit with them. \nResolution: Unauthorized hard inquiries harm credit scores. Action: Validate permissible purpose with the inquirer. If fraud or error is confirmed, recode inquiries as 'soft' or delete them entirely."
-    },
-    {
-        "issue": "Investigation took more than 30 days (LABEL_6)",
-        "content": "Complaint: I filed a dispute 40 days ago regarding a fraudulent charge, and I still haven't received a final decision. \nResolution: The FCRA generally requires disputes to be resolved within 30 days. Failure to do so is a compliance violation. Action: Expedite the investigation immediately. If the information cannot be verified within the statutory window, the disputed item must be deleted from the file."
-    },
-    {
-        "issue": "Debt is not yours (LABEL_7)",
-        "content": "Complaint: A collection agency is calling me about a $200 medical bill for a person named 'John Doe'. My name is 'Jane Smith'. \nResolution: This is a violation of the FDCPA (Fair Debt Collection Practices Act). Action: Cease collection attempts immediately. Mark the debt as disputed and request validation of debt (VOD) from the original creditor. If confirmed as not belonging to the consumer, delete the trade line."
-    },
-    {
-        "issue": "Was not notified of investigation status or results (LABEL_8)",
-        "content": "Complaint: You closed my dispute last week, but I never received a letter telling me if you fixed the error or not. \nResolution: Consumers must be provided with the results of the reinvestigation (Notice of Results) within 5 business days of completion. Action: Resend the dispute resolution letter and a free copy of the updated credit report immediately."
-    },
-    {
-        "issue": "Personal information incorrect (LABEL_9)",
-        "content": "Complaint: My last name is spelled 'Smyth' on my report, but it is actually 'Smith'. Also, my old address is listed as current. \nResolution: Accuracy of header information is critical for identity verification. Action: Accept the consumer's proof of ID (Driver's License/Utility Bill). Update the name and address fields in the Metro 2 file header."
-    },
-    {
-        "issue": "Other (LABEL_10)",
-        "content": "Complaint: The ATM took my card and didn't give it back, and I was late to work because of it. \nResolution: This is a general service or hardware issue. Action: Block the captured card to prevent fraud. Issue a new card immediately via expedited shipping. Apologize for the inconvenience."
-    }
-]
-
-# Try to get API Key from Streamlit secrets or OS environment
-def get_api_key():
-    if "GROQ_API_KEY" in st.secrets:
-        return st.secrets["GROQ_API_KEY"]
-    elif "GROQ_API_KEY" in os.environ:
-        return os.environ["GROQ_API_KEY"]
-    else:
-        # Fallback for local testing if file exists
-        try:
-            with open("GroqAPI_Key.txt", "r") as f:
-                return f.read().strip()
-        except:
-            return None
-
-@st.cache_resource(show_spinner="Loading Banking Knowledge Base...")
-def get_banking_retriever():
-    """
-    Initializes the Embedding model and Vector Store.
-    If a persistent DB exists, it uses it.
-    Otherwise, it creates an in-memory knowledge base from SAMPLE_KB_DATA.
-    """
-    try:
-        # 1. Setup Embeddings
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        
-        # 2. Check if DB exists
-        if os.path.exists(PERSIST_DIR):
-            # Load existing Vector Store
-            vectorstore = Chroma(persist_directory=PERSIST_DIR, embedding_function=embeddings)
-        else:
-            # CREATE IN-MEMORY KNOWLEDGE BASE
-            print("⚠️ Persist directory not found. Building in-memory Knowledge Base from sample data.")
-            
-            # Convert sample dictionaries to LangChain Documents
-            docs = [Document(page_content=item["content"], metadata={"issue": item["issue"]}) for item in SAMPLE_KB_DATA]
-            
-            # Create ephemeral Chroma vector store
-            vectorstore = Chroma.from_documents(documents=docs, embedding=embeddings)
-        
-        # 3. Return Retriever
-        return vectorstore.as_retriever(search_kwargs={"k": 3})
-        
-    except Exception as e:
-        print(f"Error loading retriever: {e}")
-        return None
-
-def generate_ai_response(user_complaint, category):
-    """
-    Generates a response using the cached retriever and Groq LLM.
-    Args:
-        user_complaint (str): The text input from the user.
-        category (str): The predicted category label (e.g., 'Debt is not yours').
-    """
-    
-    api_key = get_api_key()
-    if not api_key:
-        return "⚠️ Error: Groq API Key is missing. Please set it in secrets or environment variables."
-
-    # 1. Get Retriever
-    retriever = get_banking_retriever()
-    
-    # 2. Setup LLM
-    try:
-        llm = ChatGroq(
-            groq_api_key=api_key,
-            model_name="llama-3.3-70b-versatile",
-            temperature=0.1 
-        )
-    except Exception as e:
-        return f"Error initializing AI Model: {str(e)}"
-
-    # 3. Define Prompt with Contextual Category
-    # NOTE: We keep {context} so LangChain can inject the retrieved docs.
-    system_prompt = (
-        f"You are an expert Banking Resolution Advisor specializing in **{category}** cases.\n"
-        "You are an AI system analyzing historical data to provide guidance; you are NOT a bank employee handling the case directly.\n"
-        "Analyze the user's complaint and compare it with the retrieved context.\n\n"
-        "Provide a suggested resolution plan including:\n"
-        "1. Acknowledge the issue with empathy.\n"
-        "2. Explain the specific policy or regulation (e.g., FCRA, Reg E) that likely applies based on the context.\n"
-        "3. List actionable next steps the customer should take to resolve this.\n"
-        "4. Describe what the bank is expected to do under these regulations.\n\n"
-        "Important Constraints:\n"
-        "- Do NOT use placeholders like '[insert reference number]'.\n"
-        "- Do NOT say 'I will investigate'. Instead, say 'The bank is required to investigate'.\n"
-        "- Be concise and helpful.\n\n"
-        "Context from database:\n"
-        "{context}"
-    )
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", "{input}"),
-    ])
-
-    # 4. Handle Case where DB failed (Fall back to pure LLM)
-    if not retriever:
-        # If no vector store, we just use the LLM without RAG context
-        chain = prompt | llm
-        try:
-            response = chain.invoke({"input": user_complaint, "context": "No historical context available."})
-            return response.content
-        except Exception as e:
-            return f"Error generating response: {e}"
-
-    # 5. RAG Execution
-    question_answer_chain = create_stuff_documents_chain(llm, prompt)
-    rag_chain = create_retrieval_chain(retriever, question_answer_chain)
-
-    try:
-        response = rag_chain.invoke({"input": user_complaint})
-        return response["answer"]
-    except Exception as e:
-        return f"An error occurred while generating the response: {str(e)}"
\ No newline at end of file
+import os
+import shutil
+import asyncio
+import pickle
+import logging
+import numpy as np
+import streamlit as st
+
+from utils import predict_complaint_class
+
+# NOTE: the langchain_* stack (and httpx) is imported lazily inside the
+# functions that need it, so just rendering the dashboard never pays the
+# multi-second import chain or its memory footprint.
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+PERSIST_DIR = "./banking_chroma_db"
+SEMANTIC_CACHE_PATH = "./semantic_cache.pkl"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# int8-quantized ONNX export of MiniLM (VNNI) for faster CPU encoding;
+# forwarded by HuggingFaceEmbeddings straight to SentenceTransformer
+EMBEDDING_MODEL_KWARGS = {
+    "backend": "onnx",
+    "model_kwargs": {"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+}
+
+def reset_knowledge_base():
+    """
+    Clears the Streamlit cache and deletes the persistent vector DB folder.
+    This forces a reload/rebuild of the knowledge base on the next run.
+    """
+    # 1. Clear the function cache so get_banking_retriever runs again
+    st.cache_resource.clear()
+    
+    # 2. Delete the physical folder if it exists
+    if os.path.exists(PERSIST_DIR):
+        try:
+            shutil.rmtree(PERSIST_DIR)
+            st.toast("✅ Persistent Database deleted. It will be rebuilt on the next run.", icon="🗑️")
+        except Exception as e:
+            st.error(f"Error deleting DB: {e}")
+    else:
+        st.toast("ℹ️ No persistent Database found. Cache cleared.", icon="🔄")
+
+# --- IN-SCRIPT KNOWLEDGE BASE (FALLBACK) ---
+SAMPLE_KB_DATA = [
+    {
+        "issue": "Information belongs to someone else (LABEL_0)",
+        "content": "Complaint: There is a mortgage account on my credit report that belongs to my twin brother. We have similar names but different SSNs. \nResolution: This appears to be a 'mixed file' error. Under the FCRA, credit bureaus must ensure maximum possible accuracy. Action: Verify the consumer's personal identifiers (SSN, DOB). Separate the credit files immediately and send a confirmation of the correction."
+    },
+    {
+        "issue": "Reporting company used your report improperly (LABEL_1)",
+        "content": "Complaint: A car dealership pulled my credit report yesterday, but I never visited them or applied for a loan. \nResolution: Accessing a consumer report without 'permissible purpose' violates the FCRA. Action: Investigation required. If the dealership cannot prove the consumer applied for credit, the hard inquiry must be removed/suppressed from the report."
+    },
+    {
+        "issue": "Their investigation did not fix an error on your report (LABEL_2)",
+        "content": "Complaint: I disputed a late payment charge last month. You said it was verified, but I have a bank statement proving I paid on time. \nResolution: If a consumer provides new relevant information, the furnisher must conduct a reasonable reinvestigation. Action: Review the proof of payment provided. If valid, update the trade line to 'Current/Paid as Agreed' and notify all bureaus."
+    },
+    {
+        "issue": "Account information incorrect (LABEL_3)",
+        "content": "Complaint: My credit card balance is showing as $5,000 on my report, but I paid it down to zero two weeks ago. \nResolution: Data furnishing issues often occur due to reporting cycles. However, furnishers must report accurate information. Action: Check the 'Date Reported'. If the payment was made after that date, explain the cycle. If the report is outdated, trigger an off-cycle update (AUD) to correct the balance."
+    },
+    {
+        "issue": "Account status incorrect (LABEL_4)",
+        "content": "Complaint: My closed auto loan is marked as 'Voluntary Surrender' but I paid it off in full. \nResolution: Incorrect status codes can severely damage credit scores. Action: Audit the account history. If paid in full, update the account status code to '13' (Paid or closed/zero balance) or the appropriate Metro 2 code representing a positive closure."
+    },
+    {
+        "issue": "Credit inquiries on your report that you don't recognize (LABEL_5)",
+        "content": "Complaint: I see three hard inquiries from 'ABC Lending' on Jan 15th. I did not apply for credit with them. \nResolution: Unauthorized hard inquiries harm credit scores. Action: Validate permissible purpose with the inquirer. If fraud or error is confirmed, recode inquiries as 'soft' or delete them entirely."
+    },
+    {
+        "issue": "Investigation took more than 30 days (LABEL_6)",
+        "content": "Complaint: I filed a dispute 40 days ago regarding a fraudulent charge, and I still haven't received a final decision. \nResolution: The FCRA generally requires disputes to be resolved within 30 days. Failure to do so is a compliance violation. Action: Expedite the investigation immediately. If the information cannot be verified within the statutory window, the disputed item must be deleted from the file."
+    },
+    {
+        "issue": "Debt is not yours (LABEL_7)",
+        "content": "Complaint: A collection agency is calling me about a $200 medical bill for a person named 'John Doe'. My name is 'Jane Smith'. \nResolution: This is a violation of the FDCPA (Fair Debt Collection Practices Act). Action: Cease collection attempts immediately. Mark the debt as disputed and request validation of debt (VOD) from the original creditor. If confirmed as not belonging to the consumer, delete the trade line."
+    },
+    {
+        "issue": "Was not notified of investigation status or results (LABEL_8)",
+        "content": "Complaint: You closed my dispute last week, but I never received a letter telling me if you fixed the error or not. \nResolution: Consumers must be provided with the results of the reinvestigation (Notice of Results) within 5 business days of completion. Action: Resend the dispute resolution letter and a free copy of the updated credit report immediately."
+    },
+    {
+        "issue": "Personal information incorrect (LABEL_9)",
+        "content": "Complaint: My last name is spelled 'Smyth' on my report, but it is actually 'Smith'. Also, my old address is listed as current. \nResolution: Accuracy of header information is critical for identity verification. Action: Accept the consumer's proof of ID (Driver's License/Utility Bill). Update the name and address fields in the Metro 2 file header."
+    },
+    {
+        "issue": "Other (LABEL_10)",
+        "content": "Complaint: The ATM took my card and didn't give it back, and I was late to work because of it. \nResolution: This is a general service or hardware issue. Action: Block the captured card to prevent fraud. Issue a new card immediately via expedited shipping. Apologize for the inconvenience."
+    }
+]
+
+# --- PROMPT (built once at import; per-call work is just .partial substitution) ---
+# NOTE: {category} is bound per call; {context} is filled with the retrieved docs.
+SYSTEM_PROMPT_TEMPLATE = (
+    "You are an expert Banking Resolution Advisor specializing in **{category}** cases.\n"
+    "You are an AI system analyzing historical data to provide guidance; you are NOT a bank employee handling the case directly.\n"
+    "Analyze the user's complaint and compare it with the retrieved context.\n\n"
+    "Provide a suggested resolution plan including:\n"
+    "1. Acknowledge the issue with empathy.\n"
+    "2. Explain the specific policy or regulation (e.g., FCRA, Reg E) that likely applies based on the context.\n"
+    "3. List actionable next steps the customer should take to resolve this.\n"
+    "4. Describe what the bank is expected to do under these regulations.\n\n"
+    "Important Constraints:\n"
+    "- Do NOT use placeholders like '[insert reference number]'.\n"
+    "- Do NOT say 'I will investigate'. Instead, say 'The bank is required to investigate'.\n"
+    "- Be concise and helpful.\n\n"
+    "Context from database:\n"
+    "{context}"
+)
+
+# Module-level handle so the template is parsed once, on first use
+_PROMPT_TEMPLATE = None
+
+def get_prompt_template():
+    """Builds the chat prompt template once and reuses it afterwards."""
+    global _PROMPT_TEMPLATE
+    if _PROMPT_TEMPLATE is None:
+        from langchain_core.prompts import ChatPromptTemplate
+
+        _PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT_TEMPLATE),
+            ("human", "{input}"),
+        ])
+    return _PROMPT_TEMPLATE
+
+# Try to get API Key from Streamlit secrets or OS environment
+def get_api_key():
+    if "GROQ_API_KEY" in st.secrets:
+        return st.secrets["GROQ_API_KEY"]
+    elif "GROQ_API_KEY" in os.environ:
+        return os.environ["GROQ_API_KEY"]
+    else:
+        # Fallback for local testing if file exists
+        try:
+            with open("GroqAPI_Key.txt", "r") as f:
+                return f.read().strip()
+        except:
+            return None
+
+@st.cache_resource
+def get_llm():
+    """
+    Shares one ChatGroq client across calls.
+    Reusing the underlying httpx connection pool (with HTTP/2 keep-alive)
+    avoids paying DNS + TCP + TLS setup on every request.
+    """
+    import httpx
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        groq_api_key=get_api_key(),
+        model_name="llama-3.3-70b-versatile",
+        temperature=0.1,
+        streaming=True,
+        http_client=httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        ),
+    )
+
+@st.cache_resource
+def get_embeddings():
+    """
+    Loads the sentence-transformer embedding model once, on the
+    quantized ONNX backend. The embed_query/embed_documents contract is
+    unchanged, so LangChain components are none the wiser.
+    Shared between the vector store and the semantic answer cache.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs=EMBEDDING_MODEL_KWARGS,
+    )
+
+@st.cache_resource
+def get_semantic_cache():
+    """
+    In-memory semantic answer cache, persisted to disk with pickle so it
+    survives restarts.
+    "embeddings" is an (n, dim) float32 array of L2-normalized complaint
+    vectors; "entries" holds the matching (category, answer) pairs.
+    """
+    if os.path.exists(SEMANTIC_CACHE_PATH):
+        try:
+            with open(SEMANTIC_CACHE_PATH, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning("Error loading semantic cache: %s", e)
+    return {"embeddings": None, "entries": []}
+
+def embed_complaint(text):
+    """Embeds a complaint and L2-normalizes it for cosine similarity."""
+    vec = np.asarray(get_embeddings().embed_query(text), dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def semantic_cache_lookup(query_vec, category):
+    """
+    Returns a cached answer if the nearest cached complaint is close
+    enough (cosine >= SEMANTIC_CACHE_THRESHOLD) and shares the same
+    predicted category; None otherwise.
+    """
+    cache = get_semantic_cache()
+    if cache["embeddings"] is None:
+        return None
+
+    similarities = cache["embeddings"] @ query_vec
+    best = int(similarities.argmax())
+    cached_category, answer = cache["entries"][best]
+
+    if similarities[best] >= SEMANTIC_CACHE_THRESHOLD and cached_category == category:
+        return answer
+    return None
+
+def semantic_cache_store(query_vec, category, answer):
+    """Appends an entry to the semantic cache and persists it to disk."""
+    cache = get_semantic_cache()
+    row = query_vec[np.newaxis, :]
+    cache["embeddings"] = row if cache["embeddings"] is None else np.vstack([cache["embeddings"], row])
+    cache["entries"].append((category, answer))
+
+    try:
+        with open(SEMANTIC_CACHE_PATH, "wb") as f:
+            pickle.dump(cache, f)
+    except Exception as e:
+        logger.warning("Error persisting semantic cache: %s", e)
+
+@st.cache_resource(show_spinner="Loading Banking Knowledge Base...")
+def get_banking_retriever():
+    """
+    Initializes the Embedding model and Vector Store.
+    Loads the persistent DB built by build_kb.py; if it is missing
+    (e.g. first run outside the packaged image), it is built and
+    persisted once so later boots skip the embedding work.
+    """
+    try:
+        from langchain_community.vectorstores import Chroma
+
+        # 1. Setup Embeddings
+        embeddings = get_embeddings()
+
+        # 2. Load the persistent Vector Store (build it once if absent)
+        if os.path.exists(PERSIST_DIR):
+            vectorstore = Chroma(persist_directory=PERSIST_DIR, embedding_function=embeddings)
+        else:
+            logger.debug("Persist directory not found. Building and persisting the Knowledge Base once.")
+            from build_kb import build_kb
+            vectorstore = build_kb(embeddings)
+
+        # 3. Return Retriever
+        # MMR over a small prefetch keeps the 3 stuffed docs diverse
+        # instead of near-duplicates from the small KB
+        return vectorstore.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k": 3, "fetch_k": 8, "lambda_mult": 0.5},
+        )
+
+    except Exception as e:
+        logger.warning("Error loading retriever: %s", e)
+        return None
+
+async def analyze_complaint(user_complaint):
+    """
+    Runs the classifier and the knowledge-base retrieval concurrently.
+    The two workloads are independent (the label only ends up in the
+    system prompt), so overlapping them hides most of the classifier
+    latency behind the retrieval time.
+    Args:
+        user_complaint (str): The text input from the user.
+    Returns:
+        tuple: (label, docs) where label is the raw classifier output and
+        docs are the retrieved documents (None if the KB is unavailable).
+    """
+    retriever = get_banking_retriever()
+    if retriever:
+        label, docs = await asyncio.gather(
+            asyncio.to_thread(predict_complaint_class, user_complaint),
+            asyncio.to_thread(retriever.invoke, user_complaint),
+        )
+    else:
+        label = await asyncio.to_thread(predict_complaint_class, user_complaint)
+        docs = None
+    return label, docs
+
+def generate_ai_response(user_complaint, category, docs=None):
+    """
+    Streams a response using the cached retriever and Groq LLM.
+    Yields chunks of the answer as they arrive, so the UI can render
+    tokens progressively instead of waiting for the full completion.
+    Args:
+        user_complaint (str): The text input from the user.
+        category (str): The predicted category label (e.g., 'Debt is not yours').
+        docs (list, optional): Pre-retrieved documents from analyze_complaint.
+            If omitted, retrieval is performed here.
+    """
+
+    api_key = get_api_key()
+    if not api_key:
+        yield "⚠️ Error: Groq API Key is missing. Please set it in secrets or environment variables."
+        return
+
+    # 1. Short-circuit if a near-identical complaint was answered before
+    query_vec = embed_complaint(user_complaint)
+    cached_answer = semantic_cache_lookup(query_vec, category)
+    if cached_answer is not None:
+        yield cached_answer
+        return
+
+    # 2. Get Retriever
+    retriever = get_banking_retriever()
+
+    # 3. Setup LLM (shared singleton client)
+    try:
+        llm = get_llm()
+    except Exception as e:
+        yield f"Error initializing AI Model: {str(e)}"
+        return
+
+    # 4. Bind the category into the shared prompt template
+    prompt = get_prompt_template().partial(category=category)
+
+    # 5. Retrieve here only if the caller did not already do it
+    if docs is None and retriever:
+        docs = retriever.invoke(user_complaint)
+
+    # 6. Handle Case where DB failed (Fall back to pure LLM)
+    if not docs:
+        # If no vector store, we just use the LLM without RAG context
+        chain = prompt | llm
+        try:
+            for chunk in chain.stream({"input": user_complaint, "context": "No historical context available."}):
+                yield chunk.content
+        except Exception as e:
+            yield f"Error generating response: {e}"
+        return
+
+    # 7. RAG Execution: stuff the retrieved documents and stream
+    from langchain_classic.chains.combine_documents import create_stuff_documents_chain
+
+    question_answer_chain = create_stuff_documents_chain(llm, prompt)
+
+    answer = ""
+    try:
+        for chunk in question_answer_chain.stream({"input": user_complaint, "context": docs}):
+            answer += chunk
+            yield chunk
+    except Exception as e:
+        yield f"An error occurred while generating the response: {str(e)}"
+        return
+
+    # 8. Cache the full answer for future paraphrases of this complaint
+    semantic_cache_store(query_vec, category, answer)
\ No newline at end of file